@@ -3,6 +3,7 @@ from src.prim import ejecutar_prim
 from src.kruskal import ejecutar_kruskal
 from src.dijkstral import ejecutar_dijkstra
 from src.huffman import ejecutar_huffman
+from src.huffman_adaptativo import ejecutar_huffman_adaptativo
 
 def mostrar_menu(opciones):
     print('Seleccione una opción:')
@@ -35,7 +36,8 @@ def menu_principal():
         '1': ('Ejecutar PRIM', accion1),
         '2': ('Ejecutar KRUSKAL', accion2),
         '3': ('Ejecutar DIJKSTRA', accion3),
-        '4': ('Ejecutar HUFFMAN', accion4),          
+        '4': ('Ejecutar HUFFMAN', accion4),
+        '5': ('Ejecutar HUFFMAN ADAPTATIVO', accion5),
     }
 
     generar_menu(opciones, '0')
@@ -58,6 +60,10 @@ def accion4():
     print('\n Ejecutando algoritmo de Huffman...')
     ejecutar_huffman()
 
+def accion5():
+    print('\n Ejecutando algoritmo de Huffman adaptativo...')
+    ejecutar_huffman_adaptativo()
+
 def salir():
     print('Saliendo')
 
@@ -1,27 +1,88 @@
-import heapq
+import re
+import time
+from array import array
 from collections import Counter
+from itertools import islice
 
 import matplotlib.pyplot as plt
 import networkx as nx
 
+from src.instrumentacion import fase
 
-class NodoHuffman:
+
+# indice que se usa cuando un nodo no tiene hijo
+SIN_HIJO = -1
+
+class EscapeHuffman:
+    """
+    Tipo del simbolo de escape. Solo existe la instancia SIMBOLO_ESCAPE y se
+    compara por identidad, asi ningun token de entrada puede confundirse con ella.
+    """
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return "<ESC>"
+
+    __str__ = __repr__
+
+
+# simbolo que reemplaza a los tokens poco frecuentes que no entran en la tabla
+SIMBOLO_ESCAPE = EscapeHuffman()
+
+# palabras, espacios en blanco seguidos o un signo suelto
+PATRON_PALABRAS = re.compile(r"\w+|\s+|[^\w\s]")
+
+
+class ArbolHuffman:
     """
-    Nodo para el arbol de Huffman
-    freq: frecuencia del caracter
-    char: caracter 
-    izquierda o derecha: hijos
+    Arbol de Huffman guardado en arreglos paralelos, el nodo i tiene:
+    freq[i]: frecuencia del nodo
+    izquierda[i] o derecha[i]: indice de los hijos (SIN_HIJO si no hay)
+    simbolo[i]: simbolo de la hoja (None en los nodos internos)
+    Las hojas ocupan los primeros indices y la raiz el ultimo.
     """
 
-    def __init__(self, freq, char=None, izquierda=None, derecha=None):
-        self.freq = freq
-        self.char = char
-        self.izquierda = izquierda
-        self.derecha = derecha
+    __slots__ = ("freq", "izquierda", "derecha", "simbolo", "raiz")
 
-    # esto es para que heapq pueda hacer la comparacion de nodos
-    def __lt__(self, otro):
-        return self.freq < otro.freq
+    def __init__(self):
+        self.freq = array("q")
+        self.izquierda = array("q")
+        self.derecha = array("q")
+        self.simbolo = []
+        self.raiz = SIN_HIJO
+
+    def __len__(self):
+        return len(self.freq)
+
+    def agregar_hoja(self, simbolo, freq):
+        self.freq.append(freq)
+        self.izquierda.append(SIN_HIJO)
+        self.derecha.append(SIN_HIJO)
+        self.simbolo.append(simbolo)
+        return len(self.freq) - 1
+
+    def agregar_interno(self, izquierda, derecha):
+        freq = self.freq[izquierda]
+        if derecha != SIN_HIJO:
+            freq += self.freq[derecha]
+        self.freq.append(freq)
+        self.izquierda.append(izquierda)
+        self.derecha.append(derecha)
+        self.simbolo.append(None)
+        return len(self.freq) - 1
+
+    def es_hoja(self, nodo):
+        return self.izquierda[nodo] == SIN_HIJO and self.derecha[nodo] == SIN_HIJO
+
+
+def mostrar_simbolo(simbolo):
+    """se cambian los simbolos invisibles para poder mostrarlos"""
+    if simbolo == "\n":
+        return "\\n"
+    if simbolo == " ":
+        return "␣"
+    return simbolo
 
 
 def cargar_texto_desde_txt(ruta_txt):
@@ -33,107 +94,146 @@ def cargar_texto_desde_txt(ruta_txt):
 def construir_arbol_huffman(texto):
     """ se construye el arbol de Huffman a partir del texto
       Complejidad:
-        Tiempo: O(k log k), donde k es la cantidad de simbolos distintos
+        Tiempo: O(n + k log k), contar es O(n) y ordenar las k frecuencias O(k log k)
         Espacio: O(k) para guardar los nodos del arbol
     """
     if not texto:
         return None
 
-    frecuencias = Counter(texto)
+    return construir_arbol_desde_frecuencias(Counter(texto))
 
-    # se crea un nodo por cada caracter
-    monticulo = []
-    for ch, f in frecuencias.items():
-        monticulo.append(NodoHuffman(f, ch))
 
-    heapq.heapify(monticulo)
+def construir_arbol_desde_frecuencias(frecuencias):
+    """
+    Construye el arbol con el metodo de las dos colas: las hojas ordenadas por
+    frecuencia son la primera cola y los nodos internos, que se crean con
+    frecuencia creciente, son la segunda. Despues de ordenar es O(k).
+    """
+    if not frecuencias:
+        return None
+
+    hojas = sorted(frecuencias.items(), key=lambda par: par[1])
+    arbol = ArbolHuffman()
+    for simbolo, f in hojas:
+        arbol.agregar_hoja(simbolo, f)
+
+    n = len(hojas)
+
+    # este caso es si solo hay un simbolo distinto, se le da el codigo 0
+    if n == 1:
+        arbol.raiz = arbol.agregar_interno(0, SIN_HIJO)
+        return arbol
 
-    # este caso es si solo hay un carcter distinto 
-    if len(monticulo) == 1:
-        unico = monticulo[0]
-        return NodoHuffman(unico.freq, None, unico, None)
+    freq = arbol.freq
+    siguiente_hoja = 0
+    siguiente_interno = n
 
-    # se combinas los nodos de menor frecuencia hasta que quede solo uno
-    while len(monticulo) > 1:
-        n1 = heapq.heappop(monticulo)
-        n2 = heapq.heappop(monticulo)
-        nuevo = NodoHuffman(n1.freq + n2.freq, None, n1, n2)
-        heapq.heappush(monticulo, nuevo)
+    # se combinan los dos nodos de menor frecuencia hasta que quede solo uno
+    for _ in range(n - 1):
+        elegidos = []
+        for _ in range(2):
+            # en empate se prefiere la hoja, asi los codigos quedan mas parejos
+            if siguiente_hoja < n and (
+                siguiente_interno >= len(freq) or freq[siguiente_hoja] <= freq[siguiente_interno]
+            ):
+                elegidos.append(siguiente_hoja)
+                siguiente_hoja += 1
+            else:
+                elegidos.append(siguiente_interno)
+                siguiente_interno += 1
 
-    return monticulo[0]
+        arbol.agregar_interno(elegidos[0], elegidos[1])
 
+    arbol.raiz = len(freq) - 1
+    return arbol
 
-def generar_codigos(nodo, prefijo="", codigos=None):
-    """se crea el codigo binario para cada caracter del arbol de Huffman"""
-    if codigos is None:
-        codigos = {}
 
-    if nodo is None:
+def generar_codigos(arbol):
+    """se crea el codigo binario para cada simbolo del arbol de Huffman"""
+    codigos = {}
+
+    if arbol is None:
         return codigos
 
-    # si es hoja
-    if nodo.char is not None:
-        # si solo hay un caracter se le da 0
-        codigos[nodo.char] = prefijo or "0"
-    else:
+    pila = [(arbol.raiz, "")]
+    while pila:
+        nodo, prefijo = pila.pop()
+
+        # si es hoja
+        if arbol.es_hoja(nodo):
+            # si solo hay un simbolo se le da 0
+            codigos[arbol.simbolo[nodo]] = prefijo or "0"
+            continue
+
         # izquierda es 0, derecha es 1
-        generar_codigos(nodo.izquierda, prefijo + "0", codigos)
-        generar_codigos(nodo.derecha, prefijo + "1", codigos)
+        if arbol.derecha[nodo] != SIN_HIJO:
+            pila.append((arbol.derecha[nodo], prefijo + "1"))
+        if arbol.izquierda[nodo] != SIN_HIJO:
+            pila.append((arbol.izquierda[nodo], prefijo + "0"))
 
     return codigos
 
 
-def arbol_huffman_a_texto(nodo, nivel=0):
-    """se devuelve la representacion en texto del arbol de Huffman."""
-    if nodo is None:
-        return ""
+def lineas_arbol_huffman(arbol):
+    """genera una a una las lineas de la representacion en texto del arbol"""
+    if arbol is None:
+        return
 
-    sangria = "  " * nivel
+    pila = [(arbol.raiz, 0)]
+    while pila:
+        nodo, nivel = pila.pop()
+        sangria = "  " * nivel
 
-    if nodo.char is not None:
-        ch = nodo.char
-        if ch == "\n":
-            ch_mostrar = "\\n"
-        elif ch == " ":
-            ch_mostrar = "␣"
-        else:
-            ch_mostrar = ch
+        if arbol.es_hoja(nodo):
+            yield f"{sangria}Hoja: '{mostrar_simbolo(arbol.simbolo[nodo])}' (freq={arbol.freq[nodo]})\n"
+            continue
 
-        linea = f"{sangria}Hoja: '{ch_mostrar}' (freq={nodo.freq})\n"
-    else:
-        linea = f"{sangria}Nodo interno (freq={nodo.freq})\n"
-        linea += arbol_huffman_a_texto(nodo.izquierda, nivel + 1)
-        linea += arbol_huffman_a_texto(nodo.derecha, nivel + 1)
+        yield f"{sangria}Nodo interno (freq={arbol.freq[nodo]})\n"
 
-    return linea
+        # se apila primero la derecha para que salga despues de la izquierda
+        if arbol.derecha[nodo] != SIN_HIJO:
+            pila.append((arbol.derecha[nodo], nivel + 1))
+        if arbol.izquierda[nodo] != SIN_HIJO:
+            pila.append((arbol.izquierda[nodo], nivel + 1))
+
+
+def arbol_huffman_a_texto(arbol):
+    """se devuelve la representacion en texto del arbol de Huffman."""
+    return "".join(lineas_arbol_huffman(arbol))
 
 
-def agregar_nodos_y_aristas(grafo, nodo, nombre):
+def escribir_arbol_huffman(arbol, salida):
+    """se escribe el arbol en un archivo abierto sin armar todo el texto en memoria"""
+    salida.writelines(lineas_arbol_huffman(arbol))
+
+
+def agregar_nodos_y_aristas(grafo, arbol, nombre="root"):
     """
     se carga el arbon en DiGraph de networkx para que se pueda dibujar.
     """
-    if nodo.char is not None:
-        if nodo.char == "\n":
-            ch_mostrar = "\\n"
-        elif nodo.char == " ":
-            ch_mostrar = "␣"
+    pila = [(arbol.raiz, nombre)]
+    while pila:
+        nodo, nombre_nodo = pila.pop()
+
+        if arbol.es_hoja(nodo):
+            etiqueta = f"{mostrar_simbolo(arbol.simbolo[nodo])}\n{arbol.freq[nodo]}"
         else:
-            ch_mostrar = nodo.char
-        etiqueta = f"{ch_mostrar}\n{nodo.freq}"
-    else:
-        etiqueta = f"*\n{nodo.freq}"
+            etiqueta = f"*\n{arbol.freq[nodo]}"
 
-    grafo.add_node(nombre, label=etiqueta)
+        grafo.add_node(nombre_nodo, label=etiqueta)
 
-    if nodo.izquierda:
-        nombre_izq = f"{nombre}0"
-        grafo.add_edge(nombre, nombre_izq, bit="0")
-        agregar_nodos_y_aristas(grafo, nodo.izquierda, nombre_izq)
+        hijos = []
+        if arbol.izquierda[nodo] != SIN_HIJO:
+            nombre_izq = f"{nombre_nodo}0"
+            grafo.add_edge(nombre_nodo, nombre_izq, bit="0")
+            hijos.append((arbol.izquierda[nodo], nombre_izq))
 
-    if nodo.derecha:
-        nombre_der = f"{nombre}1"
-        grafo.add_edge(nombre, nombre_der, bit="1")
-        agregar_nodos_y_aristas(grafo, nodo.derecha, nombre_der)
+        if arbol.derecha[nodo] != SIN_HIJO:
+            nombre_der = f"{nombre_nodo}1"
+            grafo.add_edge(nombre_nodo, nombre_der, bit="1")
+            hijos.append((arbol.derecha[nodo], nombre_der))
+
+        pila.extend(reversed(hijos))
 
 
 def posicion_jerarquica(grafo, raiz, ancho=1.0, gap_vertical=0.2, nivel_vertical=0, x_centro=0.5, pos=None):
@@ -141,39 +241,254 @@ def posicion_jerarquica(grafo, raiz, ancho=1.0, gap_vertical=0.2, nivel_vertical
     se calculan las posiciones para dibujar el arbol de forma ordenada
     """
     if pos is None:
-        pos = {raiz: (x_centro, nivel_vertical)}
-    else:
-        pos[raiz] = (x_centro, nivel_vertical)
-
-    hijos = list(grafo.successors(raiz))
-    if not hijos:
-        return pos
-
-    dx = ancho / len(hijos)
-    siguiente_x = x_centro - ancho / 2 - dx / 2
-
-    for hijo in hijos:
-        siguiente_x += dx
-        pos = posicion_jerarquica(
-            grafo,
-            hijo,
-            ancho=dx,
-            gap_vertical=gap_vertical,
-            nivel_vertical=nivel_vertical - gap_vertical,
-            x_centro=siguiente_x,
-            pos=pos
-        )
+        pos = {}
+
+    pila = [(raiz, ancho, nivel_vertical, x_centro)]
+    while pila:
+        nodo, ancho_nodo, nivel, x = pila.pop()
+        pos[nodo] = (x, nivel)
+
+        hijos = list(grafo.successors(nodo))
+        if not hijos:
+            continue
+
+        dx = ancho_nodo / len(hijos)
+        siguiente_x = x - ancho_nodo / 2 - dx / 2
+
+        for hijo in hijos:
+            siguiente_x += dx
+            pila.append((hijo, dx, nivel - gap_vertical, siguiente_x))
 
     return pos
 
 
-def dibujar_arbol_huffman(nodo, ruta_imagen):
+def tokenizar_palabras(fuente, tam_bloque=1 << 16):
+    """
+    Genera los tokens (palabras, espacios y signos) de un string o de un archivo
+    abierto en modo texto, leyendo por bloques para no cargar todo en memoria.
+    Al unir los tokens se obtiene exactamente el texto original.
+    """
+    if isinstance(fuente, str):
+        for m in PATRON_PALABRAS.finditer(fuente):
+            yield m.group()
+        return
+
+    pendiente = ""
+    while bloque := fuente.read(tam_bloque):
+        tokens = PATRON_PALABRAS.findall(pendiente + bloque)
+        # el ultimo token puede seguir en el siguiente bloque
+        pendiente = tokens.pop()
+        yield from tokens
+
+    if pendiente:
+        yield pendiente
+
+
+def tokenizar_bytes(fuente, n=2, tam_bloque=1 << 16):
+    """
+    Genera n-gramas de bytes sin solapamiento de un bytes o de un archivo
+    abierto en modo binario. El ultimo n-grama puede ser mas corto.
+    """
+    if isinstance(fuente, (bytes, bytearray)):
+        for i in range(0, len(fuente), n):
+            yield bytes(fuente[i:i + n])
+        return
+
+    # el bloque es multiplo de n para que los n-gramas no se corten entre bloques
+    tam_bloque = max(n, tam_bloque - tam_bloque % n)
+    while bloque := fuente.read(tam_bloque):
+        for i in range(0, len(bloque), n):
+            yield bloque[i:i + n]
+
+
+def contar_tokens(tokens, max_conteo=None, lote=1 << 16):
+    """
+    Cuenta las frecuencias de los tokens y devuelve (frecuencias, total).
+    Si se da max_conteo, cada vez que el contador lo supera se quedan solo los
+    max_conteo // 2 mas frecuentes, asi la memoria queda acotada aunque el
+    alfabeto tenga millones de simbolos (los conteos pasan a ser aproximados).
+    """
+    if max_conteo is None:
+        frecuencias = Counter(tokens)
+        return frecuencias, sum(frecuencias.values())
+
+    frecuencias = Counter()
+    total = 0
+    tokens = iter(tokens)
+    while parte := list(islice(tokens, lote)):
+        frecuencias.update(parte)
+        total += len(parte)
+        if len(frecuencias) > max_conteo:
+            frecuencias = Counter(dict(frecuencias.most_common(max_conteo // 2)))
+
+    return frecuencias, total
+
+
+def construir_tabla_tokens(tokens, max_simbolos=None, max_conteo=None):
+    """
+    Construye el arbol de Huffman de los tokens y devuelve (arbol, codigos).
+    Si hay mas de max_simbolos tokens distintos solo se guardan los mas
+    frecuentes y el resto se codifica con SIMBOLO_ESCAPE seguido del token.
+    """
+    frecuencias, total = contar_tokens(tokens, max_conteo)
+
+    if max_simbolos is not None and len(frecuencias) > max_simbolos:
+        frecuencias = Counter(dict(frecuencias.most_common(max_simbolos - 1)))
+
+    escapados = total - sum(frecuencias.values())
+    if escapados > 0:
+        frecuencias[SIMBOLO_ESCAPE] = escapados
+
+    arbol = construir_arbol_desde_frecuencias(frecuencias)
+    return arbol, generar_codigos(arbol)
+
+
+def codigo_gamma(n):
+    """codigo Elias gamma de n >= 1, se usa para la longitud de los tokens escapados"""
+    binario = bin(n)[2:]
+    return "0" * (len(binario) - 1) + binario
+
+
+def codificar_simbolos(simbolos, codigos):
+    """
+    Codifica la secuencia de simbolos y devuelve (datos, cantidad de bits).
+    Los simbolos que no estan en codigos se escriben como SIMBOLO_ESCAPE,
+    la longitud en bytes (gamma) y los bytes del token (UTF-8 si es texto).
+    """
+    escape = codigos.get(SIMBOLO_ESCAPE)
+    partes = []
+
+    for simbolo in simbolos:
+        codigo = codigos.get(simbolo)
+        if codigo is not None:
+            partes.append(codigo)
+            continue
+
+        if escape is None:
+            raise KeyError(f"Simbolo sin codigo y sin escape: {simbolo!r}")
+
+        crudo = simbolo.encode("utf-8") if isinstance(simbolo, str) else simbolo
+        partes.append(escape)
+        partes.append(codigo_gamma(len(crudo)))
+        partes.append("".join(format(b, "08b") for b in crudo))
+
+    bits = "".join(partes)
+    cantidad_bits = len(bits)
+    if not cantidad_bits:
+        return b"", 0
+
+    # se rellena con ceros hasta completar el ultimo byte
+    relleno = -cantidad_bits % 8
+    datos = int(bits + "0" * relleno, 2).to_bytes((cantidad_bits + relleno) // 8, "big")
+    return datos, cantidad_bits
+
+
+def decodificar_simbolos(datos, cantidad_bits, arbol, texto=True):
+    """
+    Decodifica los datos recorriendo el arbol bit por bit y devuelve la lista
+    de simbolos. texto indica si los tokens escapados se pasan a str o quedan en bytes.
+    """
+    if not cantidad_bits:
+        return []
+
+    bits = bin(int.from_bytes(datos, "big"))[2:].zfill(len(datos) * 8)
+    izquierda = arbol.izquierda.tolist()
+    derecha = arbol.derecha.tolist()
+    simbolo = arbol.simbolo
+    raiz = arbol.raiz
+
+    simbolos = []
+    nodo = raiz
+    i = 0
+    while i < cantidad_bits:
+        nodo = izquierda[nodo] if bits[i] == "0" else derecha[nodo]
+        i += 1
+
+        if izquierda[nodo] != SIN_HIJO or derecha[nodo] != SIN_HIJO:
+            continue
+
+        actual = simbolo[nodo]
+        if actual is SIMBOLO_ESCAPE:
+            # longitud en gamma: ceros iniciales y luego el numero en binario
+            ceros = 0
+            while bits[i] == "0":
+                ceros += 1
+                i += 1
+            longitud = int(bits[i:i + ceros + 1], 2)
+            i += ceros + 1
+
+            crudo = int(bits[i:i + 8 * longitud], 2).to_bytes(longitud, "big")
+            i += 8 * longitud
+            actual = crudo.decode("utf-8") if texto else crudo
+
+        simbolos.append(actual)
+        nodo = raiz
+
+    return simbolos
+
+
+def medir_modo(nombre, tokens, unir, tam_original, texto=True, max_simbolos=None):
+    """
+    Construye la tabla, codifica y decodifica los tokens de un modo y devuelve
+    un diccionario con la tasa de compresion y el rendimiento en MB/s.
+    """
+    inicio = time.perf_counter()
+    arbol, codigos = construir_tabla_tokens(tokens, max_simbolos)
+    t_tabla = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    datos, cantidad_bits = codificar_simbolos(tokens, codigos)
+    t_codificar = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    decodificados = decodificar_simbolos(datos, cantidad_bits, arbol, texto)
+    t_decodificar = time.perf_counter() - inicio
+
+    if unir(decodificados) != unir(tokens):
+        raise AssertionError(f"El modo '{nombre}' no recupera el texto original")
+
+    megas = tam_original / 1e6
+    return {
+        "modo": nombre,
+        "simbolos_distintos": len(codigos),
+        "bytes_original": tam_original,
+        "bytes_codificado": len(datos),
+        "tasa": len(datos) / tam_original if tam_original else 0.0,
+        "tabla_s": t_tabla,
+        "codificar_mb_s": megas / t_codificar if t_codificar else float("inf"),
+        "decodificar_mb_s": megas / t_decodificar if t_decodificar else float("inf"),
+    }
+
+
+def comparar_modos(texto, max_simbolos=None, n_bytes=2):
+    """
+    Compara el modo por caracter con el modo por palabras y por n-gramas de bytes.
+    La tasa es bytes codificados / bytes UTF-8 del texto (sin contar la tabla).
+    """
+    crudo = texto.encode("utf-8")
+    tam = len(crudo)
+
+    return [
+        medir_modo("caracter", list(texto), "".join, tam),
+        medir_modo("palabra", list(tokenizar_palabras(texto)), "".join, tam, max_simbolos=max_simbolos),
+        medir_modo(
+            f"bytes-{n_bytes}",
+            list(tokenizar_bytes(crudo, n_bytes)),
+            b"".join,
+            tam,
+            texto=False,
+            max_simbolos=max_simbolos
+        ),
+    ]
+
+
+def dibujar_arbol_huffman(arbol, ruta_imagen):
     """se dibuja el arbon y se guarda como png"""
-    if nodo is None:
+    if arbol is None:
         return
 
     grafo = nx.DiGraph()
-    agregar_nodos_y_aristas(grafo, nodo, "root")
+    agregar_nodos_y_aristas(grafo, arbol, "root")
 
     posiciones = posicion_jerarquica(grafo, "root")
 
@@ -202,13 +517,7 @@ def dibujar_frecuencias(texto, ruta_imagen):
     caracteres = []
     valores = []
     for ch, f in frecuencias.items():
-        if ch == "\n":
-            etiqueta = "\\n"
-        elif ch == " ":
-            etiqueta = "␣"
-        else:
-            etiqueta = ch
-        caracteres.append(etiqueta)
+        caracteres.append(mostrar_simbolo(ch))
         valores.append(f)
 
     plt.figure(figsize=(10, 4))
@@ -221,29 +530,25 @@ def dibujar_frecuencias(texto, ruta_imagen):
     plt.close()
 
 
-def ejecutar_huffman():
+def ejecutar_huffman(metricas=None):
     print("\n[HUFFMAN] Ejecutando algoritmo de Huffman...")
 
     ruta_txt = "data/textos/mensaje_huffman.txt"
-    texto = cargar_texto_desde_txt(ruta_txt)
+    with fase(metricas, "carga"):
+        texto = cargar_texto_desde_txt(ruta_txt)
 
     if not texto:
         print("El archivo de texto esta vacio.")
         return
 
-    raiz = construir_arbol_huffman(texto)
-    codigos = generar_codigos(raiz)
-    texto_arbol = arbol_huffman_a_texto(raiz)
+    with fase(metricas, "calculo"):
+        raiz = construir_arbol_huffman(texto)
+        codigos = generar_codigos(raiz)
+        texto_arbol = arbol_huffman_a_texto(raiz)
 
     print("\n[HUFFMAN] Tabla de codigos (caracter -> codigo):\n")
     for ch, codigo in codigos.items():
-        if ch == "\n":
-            ch_mostrar = "\\n"
-        elif ch == " ":
-            ch_mostrar = "␣"
-        else:
-            ch_mostrar = ch
-        print(f"'{ch_mostrar}': {codigo}")
+        print(f"'{mostrar_simbolo(ch)}': {codigo}")
 
     print("\n[HUFFMAN] Arbol de Huffman (forma textual):\n")
     print(texto_arbol)
@@ -251,11 +556,24 @@ def ejecutar_huffman():
     ruta_arbol = "docs/evidencias/huffman_tree.png"
     ruta_freq = "docs/evidencias/huffman_freq.png"
 
-    dibujar_arbol_huffman(raiz, ruta_arbol)
-    dibujar_frecuencias(texto, ruta_freq)
+    with fase(metricas, "dibujo"):
+        dibujar_arbol_huffman(raiz, ruta_arbol)
+        dibujar_frecuencias(texto, ruta_freq)
 
     print(f"\nImagenes generadas: {ruta_arbol}, {ruta_freq}\n")
 
+    print("[HUFFMAN] Comparacion de modos (caracter, palabra, bytes):\n")
+    for r in comparar_modos(texto):
+        print(
+            f"{r['modo']}: {r['simbolos_distintos']} simbolos, "
+            f"{r['bytes_original']} -> {r['bytes_codificado']} bytes (tasa {r['tasa']:.3f}), "
+            f"codificar {r['codificar_mb_s']:.2f} MB/s, decodificar {r['decodificar_mb_s']:.2f} MB/s"
+        )
+    print()
+
+    if metricas is not None:
+        print(metricas)
+
 
 if __name__ == "__main__":
     ejecutar_huffman()
@@ -0,0 +1,349 @@
+import time
+from collections import Counter
+
+from src.huffman import codificar_simbolos, construir_arbol_desde_frecuencias, decodificar_simbolos, generar_codigos
+from src.instrumentacion import fase
+
+
+# los simbolos son bytes (0-255) y 256 marca el fin del flujo, cuando aparece un
+# simbolo nuevo se envia el codigo NYT seguido del simbolo en BITS_SIMBOLO bits
+FIN_FLUJO = 256
+BITS_SIMBOLO = 9
+
+SIN_NODO = -1
+
+
+class ArbolAdaptativo:
+    """
+    Arbol de Huffman adaptativo (algoritmo FGK) guardado en arreglos paralelos.
+    Los nodos se numeran desde la raiz (numero 0) y los pesos nunca aumentan al
+    aumentar el numero, asi cada bloque de nodos con el mismo peso es contiguo.
+    orden[k]: nodo con numero k, numero[i]: numero del nodo i
+    lider[w]: menor numero con peso w, se usa para los intercambios
+    NYT es la hoja de peso 0 de donde salen los simbolos nuevos.
+    """
+
+    __slots__ = ("peso", "padre", "izquierda", "derecha", "simbolo", "numero", "orden", "hojas", "lider", "nyt")
+
+    def __init__(self):
+        self.peso = [0]
+        self.padre = [SIN_NODO]
+        self.izquierda = [SIN_NODO]
+        self.derecha = [SIN_NODO]
+        self.simbolo = [None]
+        self.numero = [0]
+        self.orden = [0]
+        self.hojas = {}
+        self.lider = {}
+        self.nyt = 0
+
+    def nuevo_nodo(self, padre, simbolo=None):
+        nodo = len(self.peso)
+        self.peso.append(0)
+        self.padre.append(padre)
+        self.izquierda.append(SIN_NODO)
+        self.derecha.append(SIN_NODO)
+        self.simbolo.append(simbolo)
+        self.numero.append(len(self.orden))
+        self.orden.append(nodo)
+        return nodo
+
+    def codigo(self, nodo):
+        """devuelve los bits del camino de la raiz al nodo"""
+        bits = []
+        while self.padre[nodo] != SIN_NODO:
+            padre = self.padre[nodo]
+            bits.append("0" if self.izquierda[padre] == nodo else "1")
+            nodo = padre
+        bits.reverse()
+        return "".join(bits)
+
+    def intercambiar(self, a, b):
+        """intercambia la posicion en el arbol y el numero de dos nodos"""
+        padre_a = self.padre[a]
+        padre_b = self.padre[b]
+
+        if padre_a == padre_b:
+            self.izquierda[padre_a], self.derecha[padre_a] = self.derecha[padre_a], self.izquierda[padre_a]
+        else:
+            if self.izquierda[padre_a] == a:
+                self.izquierda[padre_a] = b
+            else:
+                self.derecha[padre_a] = b
+            if self.izquierda[padre_b] == b:
+                self.izquierda[padre_b] = a
+            else:
+                self.derecha[padre_b] = a
+            self.padre[a], self.padre[b] = padre_b, padre_a
+
+        numero_a = self.numero[a]
+        numero_b = self.numero[b]
+        self.numero[a], self.numero[b] = numero_b, numero_a
+        self.orden[numero_a], self.orden[numero_b] = b, a
+
+    def actualizar(self, simbolo):
+        """
+        Agrega una aparicion del simbolo y reacomoda el arbol para mantener la
+        propiedad de hermanos. El costo es O(profundidad) porque el lider de
+        cada bloque se busca en el diccionario lider.
+        """
+        nodo = self.hojas.get(simbolo)
+
+        if nodo is None:
+            # el NYT pasa a ser interno con hijos: NYT nuevo (0) y la hoja nueva (1)
+            padre = self.nyt
+            hoja = self.nuevo_nodo(padre, simbolo)
+            self.nyt = self.nuevo_nodo(padre)
+            self.izquierda[padre] = self.nyt
+            self.derecha[padre] = hoja
+            self.hojas[simbolo] = hoja
+            nodo = hoja
+
+        peso = self.peso
+        while nodo != SIN_NODO:
+            w = peso[nodo]
+            padre = self.padre[nodo]
+
+            # si el padre pesa lo mismo el hermano es el NYT; si ademas el padre es
+            # el lider, el bloque de peso w es solo {padre, nodo} y no se puede
+            # intercambiar con el padre, entonces los dos suben juntos a w + 1
+            # (con w = 0 es la hoja recien creada y el viejo NYT)
+            if padre != SIN_NODO and peso[padre] == w and self.lider.get(w, self.numero[padre]) == self.numero[padre]:
+                self.lider.pop(w, None)
+                peso[nodo] = w + 1
+                peso[padre] = w + 1
+                self.lider.setdefault(w + 1, self.numero[padre])
+                nodo = self.padre[padre]
+                continue
+
+            posicion = self.lider[w]
+            if posicion != self.numero[nodo]:
+                self.intercambiar(nodo, self.orden[posicion])
+
+            # el nodo queda al inicio del bloque w, al subir pasa a ser el ultimo de w + 1
+            siguiente = posicion + 1
+            if siguiente < len(self.orden) and peso[self.orden[siguiente]] == w:
+                self.lider[w] = siguiente
+            else:
+                del self.lider[w]
+
+            peso[nodo] = w + 1
+            self.lider.setdefault(w + 1, posicion)
+            nodo = self.padre[nodo]
+
+
+def leer_bloques(fuente, tam_bloque=1 << 16):
+    """
+    Genera bloques de bytes desde un bytes, un archivo abierto en modo binario
+    (o un socket envuelto con makefile) o un iterable de bloques de bytes.
+    """
+    if isinstance(fuente, (bytes, bytearray)):
+        yield bytes(fuente)
+        return
+
+    if hasattr(fuente, "read"):
+        while bloque := fuente.read(tam_bloque):
+            yield bloque
+        return
+
+    yield from fuente
+
+
+def codificar_adaptativo(fuente, tam_bloque=1 << 16):
+    """
+    Codifica el flujo en una sola pasada, sin conocer el resto de la entrada.
+    Despues de cada bloque de entrada se generan los bytes ya completos, asi
+    con un pipe o socket que manda bloques pequeños la salida sale de inmediato.
+    tam_bloque solo se usa para leer de archivos.
+    """
+    arbol = ArbolAdaptativo()
+    acumulado = 0
+    cantidad = 0
+    salida = bytearray()
+
+    def escribir(bits):
+        nonlocal acumulado, cantidad
+        acumulado = (acumulado << len(bits)) | int(bits, 2)
+        cantidad += len(bits)
+        while cantidad >= 8:
+            cantidad -= 8
+            salida.append((acumulado >> cantidad) & 0xFF)
+        acumulado &= (1 << cantidad) - 1
+
+    for bloque in leer_bloques(fuente, tam_bloque):
+        for byte in bloque:
+            hoja = arbol.hojas.get(byte)
+            if hoja is None:
+                escribir(arbol.codigo(arbol.nyt) + format(byte, f"0{BITS_SIMBOLO}b"))
+            else:
+                escribir(arbol.codigo(hoja))
+            arbol.actualizar(byte)
+
+        # se entrega lo que ya esta completo sin esperar a juntar mas
+        if salida:
+            yield bytes(salida)
+            salida.clear()
+
+    # el fin del flujo se envia como un simbolo nuevo especial
+    escribir(arbol.codigo(arbol.nyt) + format(FIN_FLUJO, f"0{BITS_SIMBOLO}b"))
+    if cantidad:
+        escribir("0" * (8 - cantidad))
+
+    if salida:
+        yield bytes(salida)
+
+
+def decodificar_adaptativo(fuente, tam_bloque=1 << 16):
+    """
+    Decodifica un flujo generado por codificar_adaptativo reconstruyendo el
+    mismo arbol a medida que llegan los bits. Igual que el codificador, genera
+    lo decodificado despues de cada bloque de entrada.
+    """
+    arbol = ArbolAdaptativo()
+    salida = bytearray()
+    nodo = 0
+
+    # cuando se lee un simbolo nuevo se juntan aqui sus BITS_SIMBOLO bits,
+    # al inicio la raiz es el NYT y lo primero es siempre un simbolo nuevo
+    leyendo_simbolo = True
+    valor = 0
+    faltan = BITS_SIMBOLO
+
+    for bloque in leer_bloques(fuente, tam_bloque):
+        for byte in bloque:
+            for desplazamiento in range(7, -1, -1):
+                bit = (byte >> desplazamiento) & 1
+
+                if leyendo_simbolo:
+                    valor = (valor << 1) | bit
+                    faltan -= 1
+                    if faltan:
+                        continue
+
+                    leyendo_simbolo = False
+                    if valor == FIN_FLUJO:
+                        if salida:
+                            yield bytes(salida)
+                        return
+
+                    salida.append(valor)
+                    arbol.actualizar(valor)
+                    nodo = 0
+                    continue
+
+                nodo = arbol.derecha[nodo] if bit else arbol.izquierda[nodo]
+
+                if arbol.izquierda[nodo] != SIN_NODO:
+                    continue
+
+                if nodo == arbol.nyt:
+                    leyendo_simbolo = True
+                    valor = 0
+                    faltan = BITS_SIMBOLO
+                    continue
+
+                simbolo = arbol.simbolo[nodo]
+                salida.append(simbolo)
+                arbol.actualizar(simbolo)
+                nodo = 0
+
+        # se entrega lo que ya esta completo sin esperar a juntar mas
+        if salida:
+            yield bytes(salida)
+            salida.clear()
+
+    raise ValueError("El flujo termino sin el simbolo de fin")
+
+
+def comparar_con_estatico(datos):
+    """
+    Compara el codec adaptativo (una pasada) con el Huffman estatico de dos
+    pasadas sobre los mismos bytes. La tasa del estatico no incluye la tabla,
+    que el adaptativo no necesita enviar.
+    Si alguno no recupera los datos originales se lanza AssertionError.
+    Devuelve una lista de diccionarios con tasa y MB/s de cada uno.
+    """
+    if not datos:
+        return []
+
+    megas = len(datos) / 1e6
+
+    inicio = time.perf_counter()
+    comprimido = b"".join(codificar_adaptativo(datos))
+    t_codificar = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    recuperado = b"".join(decodificar_adaptativo(comprimido))
+    t_decodificar = time.perf_counter() - inicio
+
+    if recuperado != datos:
+        raise AssertionError("El codec adaptativo no recupera los datos originales")
+
+    adaptativo = {
+        "modo": "adaptativo",
+        "bytes_original": len(datos),
+        "bytes_codificado": len(comprimido),
+        "tasa": len(comprimido) / len(datos),
+        "codificar_mb_s": megas / t_codificar if t_codificar else float("inf"),
+        "decodificar_mb_s": megas / t_decodificar if t_decodificar else float("inf"),
+    }
+
+    # la primera pasada cuenta las frecuencias, la segunda codifica
+    inicio = time.perf_counter()
+    arbol = construir_arbol_desde_frecuencias(Counter(datos))
+    codificado, cantidad_bits = codificar_simbolos(datos, generar_codigos(arbol))
+    t_codificar = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    recuperado = bytes(decodificar_simbolos(codificado, cantidad_bits, arbol))
+    t_decodificar = time.perf_counter() - inicio
+
+    if recuperado != datos:
+        raise AssertionError("El Huffman estatico no recupera los datos originales")
+
+    estatico = {
+        "modo": "estatico",
+        "bytes_original": len(datos),
+        "bytes_codificado": len(codificado),
+        "tasa": len(codificado) / len(datos),
+        "codificar_mb_s": megas / t_codificar if t_codificar else float("inf"),
+        "decodificar_mb_s": megas / t_decodificar if t_decodificar else float("inf"),
+    }
+
+    return [adaptativo, estatico]
+
+
+def ejecutar_huffman_adaptativo(metricas=None):
+    print("\n[HUFFMAN ADAPTATIVO] Ejecutando Huffman adaptativo (FGK)...")
+
+    ruta_txt = "data/textos/mensaje_huffman.txt"
+    with fase(metricas, "carga"):
+        with open(ruta_txt, "rb") as archivo:
+            datos = archivo.read()
+
+    if not datos:
+        print("El archivo de texto esta vacio.")
+        return
+
+    # comparar_con_estatico ya codifica, decodifica y verifica los dos codecs
+    with fase(metricas, "calculo"):
+        resultados = comparar_con_estatico(datos)
+
+    adaptativo = resultados[0]
+    print(f"Bytes originales: {adaptativo['bytes_original']}, comprimidos: {adaptativo['bytes_codificado']}")
+    print("Recupera el texto original: True")
+
+    print("\n[HUFFMAN ADAPTATIVO] Comparacion con Huffman estatico:\n")
+    for r in resultados:
+        print(
+            f"{r['modo']}: {r['bytes_original']} -> {r['bytes_codificado']} bytes (tasa {r['tasa']:.3f}), "
+            f"codificar {r['codificar_mb_s']:.2f} MB/s, decodificar {r['decodificar_mb_s']:.2f} MB/s"
+        )
+    print()
+
+    if metricas is not None:
+        print(metricas)
+
+
+if __name__ == "__main__":
+    ejecutar_huffman_adaptativo()
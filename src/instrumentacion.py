@@ -0,0 +1,71 @@
+import json
+import time
+from contextlib import contextmanager, nullcontext
+
+
+class Metricas:
+    """
+    Acumula contadores de operaciones y tiempos por fase de una ejecucion.
+    contadores: nombre -> cantidad de veces que ocurrio la operacion
+    fases: nombre -> segundos acumulados en esa fase
+    etiquetas: nombre -> valor descriptivo de la ejecucion (por ejemplo la cola usada)
+    """
+
+    def __init__(self, nombre=""):
+        self.nombre = nombre
+        self.contadores = {}
+        self.fases = {}
+        self.etiquetas = {}
+
+    def sumar(self, clave, cantidad=1):
+        # se acumula el contador, si no existe empieza en 0
+        self.contadores[clave] = self.contadores.get(clave, 0) + cantidad
+
+    def anotar(self, clave, valor):
+        # se guarda un dato que no es un contador, el ultimo valor es el que queda
+        self.etiquetas[clave] = valor
+
+    @contextmanager
+    def fase(self, nombre):
+        # se mide el tiempo de la fase aunque ocurra una excepcion
+        inicio = time.perf_counter()
+        try:
+            yield self
+        finally:
+            transcurrido = time.perf_counter() - inicio
+            self.fases[nombre] = self.fases.get(nombre, 0.0) + transcurrido
+
+    def reporte(self):
+        """devuelve el reporte como diccionario para poder exportarlo"""
+        return {
+            "nombre": self.nombre,
+            "etiquetas": dict(self.etiquetas),
+            "contadores": dict(self.contadores),
+            "fases_segundos": dict(self.fases),
+            "total_segundos": sum(self.fases.values()),
+        }
+
+    def guardar_json(self, ruta):
+        """se guarda el reporte en un archivo JSON"""
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            json.dump(self.reporte(), archivo, indent=2, ensure_ascii=False)
+
+    def __str__(self):
+        lineas = [f"[METRICAS] {self.nombre}"]
+        for clave, valor in self.etiquetas.items():
+            lineas.append(f"  {clave}: {valor}")
+        for clave, valor in self.contadores.items():
+            lineas.append(f"  {clave}: {valor}")
+        for clave, segundos in self.fases.items():
+            lineas.append(f"  fase {clave}: {segundos * 1000:.3f} ms")
+        return "\n".join(lineas)
+
+
+def fase(metricas, nombre):
+    """
+    Devuelve el medidor de la fase o un contexto vacio si no hay metricas,
+    asi las funciones ejecutar_* no cambian cuando la instrumentacion esta apagada.
+    """
+    if metricas is None:
+        return nullcontext()
+    return metricas.fase(nombre)
@@ -1,7 +1,11 @@
 import csv
+
 import matplotlib.pyplot as plt
 import networkx as nx
 
+from src.instrumentacion import fase
+from src.paralelo import repartir_componentes
+
 
 class ConjuntoDisjunto:
     """
@@ -40,6 +44,37 @@ class ConjuntoDisjunto:
         return True
 
 
+class ConjuntoDisjuntoInstrumentado(ConjuntoDisjunto):
+    """
+    Igual que ConjuntoDisjunto pero cuenta llamadas a encontrar, pasos de
+    compresion de camino y uniones rechazadas (aristas que formarian ciclo).
+    Solo se usa cuando se piden metricas, asi la clase base y el ciclo de
+    kruskal no pagan el costo de contar.
+    """
+
+    def __init__(self, elementos):
+        super().__init__(elementos)
+        self.llamadas_encontrar = 0
+        self.pasos_compresion = 0
+        self.uniones_rechazadas = 0
+
+    def unir(self, a, b):
+        if super().unir(a, b):
+            return True
+        self.uniones_rechazadas += 1
+        return False
+
+    def encontrar(self, x):
+        self.llamadas_encontrar += 1
+        if self.padre[x] != x:
+            raiz = self.encontrar(self.padre[x])
+            # solo cuenta como compresion si el padre realmente cambia
+            if self.padre[x] != raiz:
+                self.pasos_compresion += 1
+                self.padre[x] = raiz
+        return self.padre[x]
+
+
 def cargar_nodos_y_aristas(ruta_csv):
     """
     Se lee archivo CSV y devuelvee nodos y aristas.
@@ -71,17 +106,79 @@ def cargar_nodos_y_aristas(ruta_csv):
     return list(nodos), aristas
 
 
-def kruskal(nodos, aristas):
+def contar_componentes(nodos, aristas):
+    """
+    Cuenta las componentes conexas con conjuntos disjuntos, sin agrupar nodos
+    ni aristas. Se detiene apenas queda una sola componente.
+    Complejidad: O(V + E log V) en el peor caso
+    """
+    # aqui solo importa contar, por eso la busqueda va en linea con reduccion
+    # a la mitad del camino y sin union por rango, que es mas rapido en Python
+    padre = {x: x for x in nodos}
+    componentes = len(nodos)
+
+    for u, v, _ in aristas:
+        while padre[u] != u:
+            padre[u] = padre[padre[u]]
+            u = padre[u]
+        while padre[v] != v:
+            padre[v] = padre[padre[v]]
+            v = padre[v]
+
+        if u != v:
+            padre[u] = v
+            componentes -= 1
+            if componentes == 1:
+                break
+
+    return componentes
+
+
+def agrupar_componentes(nodos, aristas):
+    """
+    Separa el grafo en componentes conexas usando conjuntos disjuntos.
+    Devuelve una lista de (nodos, aristas) por componente.
+    Complejidad: O(V + E α(V))
+    """
+    ds = ConjuntoDisjunto(nodos)
+    for u, v, _ in aristas:
+        ds.unir(u, v)
+
+    grupos = {}
+    for nodo in nodos:
+        grupos.setdefault(ds.encontrar(nodo), ([], []))[0].append(nodo)
+    for arista in aristas:
+        grupos[ds.encontrar(arista[0])][1].append(arista)
+
+    return list(grupos.values())
+
+
+def kruskal(nodos, aristas, metricas=None, componentes=None):
     """
     Implementacion del algoritmo de Kruskal devuelve aristas del MST y el costo total
     Complejidad:
         Tiempo: O(E log E) ≈ O(E log V) por el ordenamiento de aristas
         Espacio: O(V + E) por las estructuras de conjuntos disjuntos y la lista de aristas
+    metricas: objeto Metricas opcional donde se registran llamadas a encontrar,
+    pasos de compresion y aristas rechazadas
+    componentes: cantidad de componentes conexas si ya se conoce, si es None
+    se cuenta con contar_componentes antes de empezar
+    Si el grafo no es conexo devuelve el bosque de expansion minima.
     """
     if not nodos or not aristas:
         return [], 0.0
 
-    ds = ConjuntoDisjunto(nodos)
+    if componentes is None:
+        componentes = contar_componentes(nodos, aristas)
+
+    # el bosque tiene V - C aristas, con C la cantidad de componentes
+    aristas_bosque = len(nodos) - componentes
+
+    if metricas is None:
+        ds = ConjuntoDisjunto(nodos)
+    else:
+        ds = ConjuntoDisjuntoInstrumentado(nodos)
+
     # se ordenan las aristas por el peso 
     aristas_ordenadas = sorted(aristas, key=lambda x: x[2])
 
@@ -93,13 +190,44 @@ def kruskal(nodos, aristas):
             mst.append((u, v, peso))
             costo_total += peso
 
-            # siempre hay una arista menos que la cantidad de nodos
-            if len(mst) == len(nodos) - 1:
+            # ya estan unidas todas las componentes, el resto de aristas sobra
+            if len(mst) == aristas_bosque:
                 break
 
+    if metricas is not None:
+        metricas.sumar("llamadas_encontrar", ds.llamadas_encontrar)
+        metricas.sumar("pasos_compresion", ds.pasos_compresion)
+        metricas.sumar("aristas_rechazadas", ds.uniones_rechazadas)
+
     return mst, costo_total
 
 
+def kruskal_componente(grupo):
+    """calcula el MST de una componente (nodos, aristas), se usa en el pool de procesos"""
+    nodos, aristas = grupo
+    # la componente ya es conexa, no hace falta volver a contar
+    return kruskal(nodos, aristas, componentes=1)
+
+
+def kruskal_paralelo(nodos, aristas, procesos=None):
+    """
+    Calcula el bosque de expansion minima separando el grafo en componentes
+    conexas. Las componentes grandes (MIN_NODOS_PARALELO nodos o mas) se
+    reparten en un pool de procesos, las pequeñas se calculan aqui mismo.
+    procesos: cantidad maxima de procesos, None usa la cantidad de CPUs.
+    Devuelve (bosque, costo_total, cantidad de componentes).
+    """
+    componentes = agrupar_componentes(nodos, aristas)
+
+    bosque, costo_total = repartir_componentes(
+        componentes,
+        kruskal_componente,
+        procesos,
+        tamano=lambda grupo: len(grupo[0])
+    )
+    return bosque, costo_total, len(componentes)
+
+
 def dibujar_mst(aristas, mst, ruta_imagen):
     """
     Dibuja el grafo completo y resalta el MST.
@@ -136,17 +264,23 @@ def dibujar_mst(aristas, mst, ruta_imagen):
     plt.close()
 
 
-def ejecutar_kruskal():
+def ejecutar_kruskal(metricas=None):
     print("\n[KRUSKAL] Ejecutando algoritmo de Kruskal...")
 
     ruta_csv = "data/grafos/grafos_ciudades.csv"
-    nodos, aristas = cargar_nodos_y_aristas(ruta_csv)
+    with fase(metricas, "carga"):
+        nodos, aristas = cargar_nodos_y_aristas(ruta_csv)
 
     if not nodos or not aristas:
         print("No se pudieron cargar nodos o aristas desde el CSV.")
         return
 
-    mst, costo_total = kruskal(nodos, aristas)
+    with fase(metricas, "calculo"):
+        cantidad_componentes = contar_componentes(nodos, aristas)
+        mst, costo_total = kruskal(nodos, aristas, metricas, cantidad_componentes)
+
+    if cantidad_componentes > 1:
+        print(f"\n[KRUSKAL] El grafo no es conexo ({cantidad_componentes} componentes), se obtiene un bosque.")
 
     print("\n[KRUSKAL] Arbol de expansion minima (MST):")
     for u, v, peso in mst:
@@ -155,9 +289,13 @@ def ejecutar_kruskal():
     print(f"Costo total del MST: {costo_total}\n")
 
     ruta_imagen = "docs/evidencias/kruskal_mst.png"
-    dibujar_mst(aristas, mst, ruta_imagen)
+    with fase(metricas, "dibujo"):
+        dibujar_mst(aristas, mst, ruta_imagen)
     print(f"Imagen generada: {ruta_imagen}\n")
 
+    if metricas is not None:
+        print(metricas)
+
 
 if __name__ == "__main__":
     ejecutar_kruskal()
@@ -0,0 +1,42 @@
+from concurrent.futures import ProcessPoolExecutor
+
+
+# las componentes con menos nodos que esto se calculan en el proceso principal,
+# para ellas enviar los datos a otro proceso cuesta mas que calcular el MST
+MIN_NODOS_PARALELO = 5000
+
+
+def repartir_componentes(grupos, funcion, procesos=None, tamano=len):
+    """
+    Calcula funcion(grupo) para cada componente y junta los resultados en un
+    bosque. Las componentes grandes (MIN_NODOS_PARALELO nodos o mas) se
+    reparten en un pool de procesos, las pequeñas se calculan aqui mismo.
+    funcion: debe devolver (mst, costo) y poder enviarse a otro proceso
+    procesos: cantidad maxima de procesos, None usa la cantidad de CPUs
+    tamano: devuelve la cantidad de nodos de un grupo
+    Devuelve (bosque, costo_total).
+    """
+    grandes = []
+    pequenas = []
+    for grupo in grupos:
+        if tamano(grupo) >= MIN_NODOS_PARALELO:
+            grandes.append(grupo)
+        else:
+            pequenas.append(grupo)
+
+    resultados = [funcion(grupo) for grupo in pequenas]
+
+    # con una sola componente grande no vale la pena crear procesos
+    if len(grandes) > 1 and procesos != 1:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            resultados.extend(pool.map(funcion, grandes))
+    else:
+        resultados.extend(funcion(grupo) for grupo in grandes)
+
+    bosque = []
+    costo_total = 0.0
+    for mst, costo in resultados:
+        bosque.extend(mst)
+        costo_total += costo
+
+    return bosque, costo_total
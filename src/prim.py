@@ -1,9 +1,13 @@
 import heapq
 import csv
+from collections import deque
 
 import matplotlib.pyplot as plt
 import networkx as nx
 
+from src.instrumentacion import fase
+from src.paralelo import repartir_componentes
+
 
 def cargar_grafo_desde_csv(ruta_csv):
     """
@@ -45,48 +49,118 @@ def cargar_grafo_desde_csv(ruta_csv):
     return grafo, aristas
 
 
-def prim(grafo):
+def componentes_conexas(grafo):
+    """
+    Devuelve la lista de componentes conexas del grafo, cada una como lista de
+    nodos, recorriendo el grafo con BFS.
+    Complejidad: O(V + E)
+    """
+    visitados = set()
+    componentes = []
+
+    for inicio in grafo:
+        if inicio in visitados:
+            continue
+
+        visitados.add(inicio)
+        componente = [inicio]
+        cola = deque([inicio])
+        while cola:
+            nodo = cola.popleft()
+            for vecino, _ in grafo[nodo]:
+                if vecino not in visitados:
+                    visitados.add(vecino)
+                    componente.append(vecino)
+                    cola.append(vecino)
+
+        componentes.append(componente)
+
+    return componentes
+
+
+def prim(grafo, metricas=None):
     """
-    Se implemneta la lista la devolucion de la lista de atistas del MST y el costo total
+    Se implemneta la lista la devolucion de la lista de atistas del MST y el costo total.
+    Si el grafo no es conexo se inicia un arbol nuevo en cada componente, y el
+    resultado es el bosque de expansion minima.
     Complejidad:
         Tiempo: O(E log V), usando cola de prioridad (heap)
         Espacio: O(V + E) por el grafo y las estructuras auxiliares
+    metricas: objeto Metricas opcional donde se registran pushes, pops y
+    entradas obsoletas saltadas del heap
     """
     if not grafo:
         return [], 0.0
 
-    # se inica con cualqueir nodo
-    nodo_inicio = next(iter(grafo.keys()))
-    visitados = set([nodo_inicio])
-
-    # cola de prioridad
-    cola = []
-    for vecino, peso in grafo[nodo_inicio]:
-        heapq.heappush(cola, (peso, nodo_inicio, vecino))
-
+    visitados = set()
     mst = []
     costo_total = 0.0
 
-    # esto se realiza mientras haya aristas y falten nodos por visitar
-    while cola and len(visitados) < len(grafo):
-        peso, u, v = heapq.heappop(cola)
+    # solo se cuentan las entradas obsoletas, los pops y pushes se deducen al
+    # final para no agregar trabajo por operacion cuando no se miden metricas
+    pushes_restantes = 0
+    saltados = 0
 
-        # si ya se ha visitado el nodo es ignorado
-        if v in visitados:
+    # cada nodo no visitado es el inicio de un arbol de otra componente
+    for nodo_inicio in grafo:
+        if nodo_inicio in visitados:
             continue
 
-        visitados.add(v)
-        mst.append((u, v, peso))
-        costo_total += peso
+        visitados.add(nodo_inicio)
+
+        # cola de prioridad
+        cola = []
+        for vecino, peso in grafo[nodo_inicio]:
+            heapq.heappush(cola, (peso, nodo_inicio, vecino))
 
-        # agregamos las nuevas aristas del nodo v
-        for siguiente, peso2 in grafo[v]:
-            if siguiente not in visitados:
-                heapq.heappush(cola, (peso2, v, siguiente))
+        # esto se realiza mientras haya aristas y falten nodos por visitar
+        while cola and len(visitados) < len(grafo):
+            peso, u, v = heapq.heappop(cola)
+
+            # si ya se ha visitado el nodo es ignorado
+            if v in visitados:
+                saltados += 1
+                continue
+
+            visitados.add(v)
+            mst.append((u, v, peso))
+            costo_total += peso
+
+            # agregamos las nuevas aristas del nodo v
+            for siguiente, peso2 in grafo[v]:
+                if siguiente not in visitados:
+                    heapq.heappush(cola, (peso2, v, siguiente))
+
+        pushes_restantes += len(cola)
+
+        if len(visitados) == len(grafo):
+            break
+
+    if metricas is not None:
+        # cada pop agrega una arista al bosque o es una entrada obsoleta
+        pops = len(mst) + saltados
+        metricas.sumar("heap_push", pops + pushes_restantes)
+        metricas.sumar("heap_pop", pops)
+        metricas.sumar("entradas_obsoletas", saltados)
 
     return mst, costo_total
 
 
+def prim_paralelo(grafo, procesos=None):
+    """
+    Calcula el bosque de expansion minima separando el grafo en componentes
+    conexas. Las componentes grandes (MIN_NODOS_PARALELO nodos o mas) se
+    reparten en un pool de procesos, las pequeñas se calculan aqui mismo.
+    procesos: cantidad maxima de procesos, None usa la cantidad de CPUs.
+    Devuelve (bosque, costo_total, cantidad de componentes).
+    """
+    componentes = componentes_conexas(grafo)
+    subgrafos = [{nodo: grafo[nodo] for nodo in componente} for componente in componentes]
+
+    bosque, costo_total = repartir_componentes(subgrafos, prim, procesos)
+    return bosque, costo_total, len(componentes)
+
+
 def dibujar_mst(aristas, mst, ruta_imagen):
     """
     Se dibuja el grafo y se resalta
@@ -127,19 +201,26 @@ def dibujar_mst(aristas, mst, ruta_imagen):
     plt.close()
 
 
-def ejecutar_prim():
+def ejecutar_prim(metricas=None):
     print("\n[PRIM] Ejecutando algoritmo de Prim...")
 
     # esta es la ruta del archivo de entrada
     ruta_csv = "data/grafos/grafos_ciudades.csv"
 
-    grafo, aristas = cargar_grafo_desde_csv(ruta_csv)
+    with fase(metricas, "carga"):
+        grafo, aristas = cargar_grafo_desde_csv(ruta_csv)
 
     if not grafo:
         print("El grafo no se pudo cargar o está vacio.")
         return
 
-    mst, costo_total = prim(grafo)
+    with fase(metricas, "calculo"):
+        mst, costo_total = prim(grafo, metricas)
+
+    # un bosque tiene V - C aristas, asi que no hace falta recorrer de nuevo el grafo
+    cantidad_componentes = len(grafo) - len(mst)
+    if cantidad_componentes > 1:
+        print(f"\n[PRIM] El grafo no es conexo ({cantidad_componentes} componentes), se obtiene un bosque.")
 
     print("\n[PRIM] Arbol de expansion minima (MST):")
     for u, v, peso in mst:
@@ -149,9 +230,13 @@ def ejecutar_prim():
      
     # esta es la ruta para nuestra evidencia
     ruta_imagen = "docs/evidencias/prim_mst.png"
-    dibujar_mst(aristas, mst, ruta_imagen)
+    with fase(metricas, "dibujo"):
+        dibujar_mst(aristas, mst, ruta_imagen)
     print(f"Imagen generada: {ruta_imagen}\n")
 
+    if metricas is not None:
+        print(metricas)
+
 
 if __name__ == "__main__":
     ejecutar_prim()